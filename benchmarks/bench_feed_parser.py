@@ -0,0 +1,65 @@
+# benchmarks/bench_feed_parser.py
+# Compares the current feedparser path with the streaming engine.
+# Usage: python benchmarks/bench_feed_parser.py [items] [runs]
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedparser
+from duck.utils.feed_parser import parse_bytes, FeedEntry
+
+def build_feed(items):
+    """Synthetic RSS 2.0 feed shaped like the ones in NEWS_FEED_URLS."""
+    body = "<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20 + "</p>"
+    entries = "".join(
+        f"""
+        <item>
+            <title>Anime Title {i} Season 2 Announced</title>
+            <link>https://example.com/news/{i}</link>
+            <description><![CDATA[{body}]]></description>
+            <pubDate>Mon, 06 May 2024 10:{i % 60:02d}:00 +0000</pubDate>
+            <media:content url="https://example.com/img/{i}.jpg" medium="image" />
+            <enclosure url="https://example.com/img/{i}.jpg" type="image/jpeg" length="0" />
+        </item>"""
+        for i in range(items)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">
+<channel>
+    <title>Benchmark Feed</title>
+    <link>https://example.com</link>
+    <description>Benchmark</description>{entries}
+</channel>
+</rss>""".encode()
+
+def current_path(data):
+    # What check_feeds did: full parse, then the first 3 entries
+    return [FeedEntry.from_feedparser(e) for e in feedparser.parse(data).entries[:3]]
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    data = build_feed(items)
+
+    # Same output for the fields we use
+    old, new = current_path(data), parse_bytes(data, limit=3)
+    assert [(e.link, e.title) for e in old] == [(e.link, e.title) for e in new]
+
+    cases = {
+        "feedparser (full parse, first 3)": lambda: current_path(data),
+        "stream (full parse)": lambda: parse_bytes(data),
+        "stream (limit=3)": lambda: parse_bytes(data, limit=3),
+        "stream (stop at seen, 1 new)": lambda: parse_bytes(data, limit=3, seen={"https://example.com/news/1"}),
+    }
+
+    print(f"Feed: {items} items, {len(data) / 1024:.1f} KiB, {runs} runs")
+    baseline = None
+    for name, func in cases.items():
+        per_run = timeit.timeit(func, number=runs) / runs * 1000
+        baseline = baseline or per_run
+        print(f"{name:<36} {per_run:8.3f} ms  ({baseline / per_run:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -13,3 +13,42 @@ NEWS_FEED_URLS = [
     "https://crunchyroll.com/newsrss?lang=en",
     "https://screenrant.com/feed/category/anime/"
 ]
+
+# Backfill / catch-up mode (python main.py --backfill <hours or YYYY-MM-DD>)
+BACKFILL_CONCURRENCY = 4        # Entries scraped + AI-processed in parallel
+BACKFILL_PUBLISH_DELAY = 5      # Seconds between posts while backfilling
+BACKFILL_MAX_PAGES = 5          # Max archive pages to walk per feed
+
+# Priority scheduling (breaking news jumps the queue)
+PRIORITY_KEYWORDS = {  # Stems: "announce" also matches announces / announced / announcement
+    "breaking": 30, "announce": 15, "reveal": 10, "confirm": 10,
+    "season": 10, "sequel": 12, "movie": 10, "trailer": 8,
+    "delay": 12, "cancel": 15, "hiatus": 12,
+    "ends": 10, "final": 8, "teaser": 5, "visual": 5
+}
+SOURCE_WEIGHTS = {"Crunchyroll": 10, "Animenewsnetwork": 8, "Screenrant": 0}
+PRIORITY_AGING_PER_MIN = 1.0      # Score gained per minute waiting (nothing starves)
+PRIORITY_AI_FALLBACK_BELOW = 20   # Under AI quota pressure, items below this importance (no recency) skip the AI
+AI_CALLS_PER_MINUTE = 8           # Soft AI budget used to detect quota pressure
+
+# Catbox uploads
+CATBOX_UPLOAD_THUMBNAIL = False   # Upload our rendered (compressed) thumbnail instead of the raw source image
+CATBOX_PHASH_DISTANCE = 4         # Max perceptual-hash distance to treat two images as the same
+
+# Fallback art (used when an article has no image)
+FALLBACK_CACHE_DIR = "duck/assets/cache/fallback"
+FALLBACK_CACHE_MAX_FILES = 300    # Oldest series art is pruned above this
+FALLBACK_WARM_INTERVAL = 30       # Seconds between idle pre-generation checks
+
+# Feed parsing engine: "stream" (lxml, incremental, stops at seen items) or "feedparser"
+FEED_PARSER_ENGINE = "stream"
+POST_RETRIES = 5                  # Polls a failed entry is retried on before giving up
+
+# User registry (write-behind batching)
+USER_FLUSH_INTERVAL = 10          # Seconds between user flushes
+USER_FLUSH_SIZE = 100             # Flush early once this many users are buffered
+
+# Broadcast (/broadcast, owner only)
+BROADCAST_RATE = 25               # Messages per second (Telegram allows ~30)
+BROADCAST_CONCURRENCY = 10        # Sends in flight at once
+BROADCAST_BATCH_SIZE = 200        # Users per batch (progress is checkpointed per batch)
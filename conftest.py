@@ -0,0 +1,2 @@
+# conftest.py
+# Lets pytest import the bot modules (duck/, config.py) from the repo root.
@@ -1,6 +1,8 @@
+import asyncio
 import motor.motor_asyncio
 import logging
-from config import MONGO_URI
+from pymongo import UpdateOne
+from config import MONGO_URI, USER_FLUSH_INTERVAL, USER_FLUSH_SIZE
 
 # Configure Logger
 logger = logging.getLogger(__name__)
@@ -15,6 +17,11 @@ class Database:
             # Collections (Tables)
             self.news_col = self.db["news_history"]  # Stores posted links
             self.users_col = self.db["users"]        # Stores bot users
+            self.uploads_col = self.db["uploads"]    # Image hash -> Catbox URL
+            self.broadcast_col = self.db["broadcasts"]  # Broadcast checkpoints
+
+            # Users waiting to be written (user_id -> name)
+            self.user_buffer = {}
             
             logger.info("✅ Database Connected Successfully")
         except Exception as e:
@@ -26,6 +33,14 @@ class Database:
         doc = await self.news_col.find_one({"link": link})
         return True if doc else False
 
+    async def filter_unposted(self, links):
+        """Returns the subset of links not yet posted (one query for the whole batch)."""
+        if not links:
+            return set()
+        cursor = self.news_col.find({"link": {"$in": list(links)}}, {"link": 1, "_id": 0})
+        posted = {doc["link"] async for doc in cursor}
+        return set(links) - posted
+
     async def add_post(self, link, title):
         """Saves a link to history so we don't post it again."""
         await self.news_col.insert_one({
@@ -33,19 +48,109 @@ class Database:
             "title": title
         })
 
+    # --- Upload Logic ---
+    async def find_upload(self, sha256=None, phash=None, source_url=None):
+        """Finds a previous Catbox upload by content hash, perceptual hash or source URL."""
+        for field, value in (("source_urls", source_url), ("sha256", sha256), ("phash", phash)):
+            if value:
+                doc = await self.uploads_col.find_one({field: value})
+                if doc:
+                    return doc
+        return None
+
+    async def get_recent_phashes(self, limit=500):
+        """Returns (phash, url) of the latest uploads for near-duplicate matching."""
+        cursor = self.uploads_col.find({}, {"phash": 1, "url": 1, "_id": 0}).sort("_id", -1).limit(limit)
+        return [(doc["phash"], doc["url"]) async for doc in cursor if doc.get("phash")]
+
+    async def add_upload(self, sha256, phash, url, source_url=None):
+        """Remembers an uploaded image (upsert, so concurrent uploads can't duplicate)."""
+        update = {"$setOnInsert": {"phash": phash, "url": url}}
+        if source_url:
+            update["$addToSet"] = {"source_urls": source_url}
+        await self.uploads_col.update_one({"sha256": sha256}, update, upsert=True)
+
+    async def add_upload_source(self, url, source_url):
+        """Links another source URL to an existing upload."""
+        await self.uploads_col.update_one({"url": url}, {"$addToSet": {"source_urls": source_url}})
+
     # --- User Logic ---
     async def add_user(self, user_id, name):
-        """Adds a user to the database if they don't exist."""
-        if not await self.users_col.find_one({"user_id": user_id}):
-            await self.users_col.insert_one({
-                "user_id": user_id,
-                "name": name
-            })
+        """Queues a user for the next batched upsert (flushed on interval or size)."""
+        self.user_buffer[user_id] = name
+        if len(self.user_buffer) >= USER_FLUSH_SIZE:
+            await self.flush_users()
+
+    async def flush_users(self):
+        """Writes buffered users in one bulk upsert (unique user_id index, no duplicates)."""
+        if not self.user_buffer:
+            return
+        batch, self.user_buffer = self.user_buffer, {}
+        try:
+            await self.users_col.bulk_write([
+                UpdateOne({"user_id": user_id}, {"$set": {"name": name}}, upsert=True)
+                for user_id, name in batch.items()
+            ], ordered=False)
+        except Exception as e:
+            logger.error(f"❌ User Flush Failed: {e}")
+            # Keep them for the next flush (names buffered meanwhile are newer and win)
+            self.user_buffer = {**batch, **self.user_buffer}
+
+    async def user_flush_loop(self):
+        """Background task: flushes the user buffer every USER_FLUSH_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(USER_FLUSH_INTERVAL)
+            await self.flush_users()
 
     async def get_total_users(self):
         """Returns the count of total users."""
+        await self.flush_users()
         return await self.users_col.count_documents({})
 
+    async def iter_user_batches(self, after_id=None, batch_size=200):
+        """Streams users (ordered by _id, resumable) in lists of `batch_size`."""
+        query = {"_id": {"$gt": after_id}} if after_id else {}
+        cursor = self.users_col.find(query, {"user_id": 1}).sort("_id", 1).batch_size(batch_size)
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def delete_users(self, user_ids):
+        """Removes users in bulk (blocked the bot / deleted account)."""
+        if user_ids:
+            await self.users_col.delete_many({"user_id": {"$in": user_ids}})
+
+    # --- Broadcast Logic ---
+    async def get_broadcast(self):
+        """Returns the unfinished broadcast checkpoint, if any."""
+        return await self.broadcast_col.find_one({"_id": "active"})
+
+    async def save_broadcast(self, state):
+        await self.broadcast_col.replace_one({"_id": "active"}, state, upsert=True)
+
+    async def clear_broadcast(self):
+        await self.broadcast_col.delete_one({"_id": "active"})
+
+    # --- Setup ---
+    async def ensure_indexes(self):
+        """Creates the indexes the lookups rely on (safe to call on every start)."""
+        try:
+            await self.users_col.create_index("user_id", unique=True)
+        except Exception as e:
+            # Usually duplicates left over from the old find_one + insert_one race
+            logger.error(f"❌ Unique user_id Index Failed: {e}")
+        try:
+            await self.uploads_col.create_index("sha256", unique=True)
+            await self.uploads_col.create_index("phash")
+            await self.uploads_col.create_index("source_urls")
+        except Exception as e:
+            logger.error(f"❌ Index Creation Failed: {e}")
+
 # Create a single instance to be used in main.py
 db = Database()
 
@@ -1,8 +1,10 @@
 from huggingface_hub import InferenceClient
 import logging
 import re
+import time
 import asyncio
-from config import HF_TOKEN
+from collections import deque
+from config import HF_TOKEN, AI_CALLS_PER_MINUTE
 from duck.utils.text_styler import styler
 
 logging.basicConfig(level=logging.INFO)
@@ -10,6 +12,10 @@ logger = logging.getLogger(__name__)
 
 class AIEditor:
     def __init__(self):
+        # Quota tracking (timestamps of recent calls / last rate limit)
+        self.recent_calls = deque()
+        self.last_rate_limit = 0
+
         try:
             if HF_TOKEN:
                 # 1. Use the model you requested
@@ -38,13 +44,19 @@ class AIEditor:
 
         # Retry loop for model loading / timeouts
         for attempt in range(3):
+            self.recent_calls.append(time.monotonic())
             try:
                 # We use chat_completion which works for "Conversational" models
-                response = self.client.chat_completion(
-                    messages,
-                    model=self.repo_id,
-                    max_tokens=1500,
-                    temperature=0.7
+                # Run in a thread executor (HF client is sync) so parallel posts don't block the loop
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(
+                    None,
+                    lambda: self.client.chat_completion(
+                        messages,
+                        model=self.repo_id,
+                        max_tokens=1500,
+                        temperature=0.7
+                    )
                 )
                 
                 # Extract the message content
@@ -52,6 +64,8 @@ class AIEditor:
 
             except Exception as e:
                 error_str = str(e).lower()
+                if "rate limit" in error_str or "429" in error_str:
+                    self.last_rate_limit = time.monotonic()
                 if "loading" in error_str or "rate limit" in error_str:
                     logger.warning(f"⚠️ GLM-4 Loading/Busy (Attempt {attempt+1}). Sleeping 10s...")
                     await asyncio.sleep(10)
@@ -63,9 +77,20 @@ class AIEditor:
                     return None
         return None
 
-    async def generate_hype_caption(self, title, summary, source_name):
+    def is_under_pressure(self):
+        """True if we hit a rate limit recently or are close to the per-minute AI budget."""
+        now = time.monotonic()
+        while self.recent_calls and now - self.recent_calls[0] > 60:
+            self.recent_calls.popleft()
+        if now - self.last_rate_limit < 120:
+            return True
+        return len(self.recent_calls) >= AI_CALLS_PER_MINUTE * 0.8
+
+    async def generate_hype_caption(self, title, summary, source_name, use_ai=True):
         # Fallback text
         fallback = f"{styler.convert(title, 'bold_sans')}\n\n{summary[:250]}..."
+        if not use_ai:
+            return fallback
         
         system_prompt = (
             "You are a professional Anime News Anchor. "
@@ -96,10 +121,12 @@ class AIEditor:
         
         return fallback
 
-    async def format_article_html(self, title, full_text, image_url):
+    async def format_article_html(self, title, full_text, image_url, use_ai=True):
         # Fallback HTML
         clean_text = full_text.replace("\n", "<br>")
         fallback = f"<img src='{image_url}'><br><h3>{title}</h3><br><p>{clean_text}</p>"
+        if not use_ai:
+            return fallback
 
         system_prompt = (
             "You are an expert HTML Editor for a blog. "
@@ -0,0 +1,68 @@
+import re
+
+# Generic backgrounds, pre-generated while idle: category -> (title keywords, prompt)
+CATEGORY_ART = {
+    "trailer": (("trailer", "teaser", "pv", "promo", "preview"), "cinematic anime trailer frame, dramatic lighting, lens flare"),
+    "movie": (("movie", "film", "theatrical", "box"), "anime movie poster scene, epic cityscape at dusk"),
+    "manga": (("manga", "chapter", "volume", "serialization", "one-shot"), "manga panels and ink, open manga book on a desk"),
+    "season": (("season", "sequel", "renewed", "premiere", "cour"), "anime characters silhouettes under cherry blossoms, new season"),
+    "game": (("game", "gacha", "console", "switch", "playstation"), "anime video game key art, glowing ui, fantasy battle"),
+    "event": (("event", "expo", "convention", "award", "awards", "festival", "concert"), "anime convention stage with lights and crowd"),
+    "generic": ((), "anime newsroom, tokyo skyline at night, neon signs"),
+}
+
+# Series name ends at the first of these
+SERIES_CUT_WORDS = {
+    "anime", "manga", "season", "movie", "film", "tv", "gets", "reveals", "announces",
+    "announced", "confirms", "trailer", "teaser", "episode", "chapter", "series", "is", "will",
+    "lineup", "slate", "schedule"
+}
+
+# Outlets / streamers that lead headlines ("Netflix Reveals Sakamoto Days")
+PUBLISHER_WORDS = {
+    "crunchyroll", "netflix", "funimation", "hidive", "aniplex", "toho", "toei", "mappa",
+    "disney", "hulu", "amazon", "prime", "video", "adult", "swim", "sentai", "viz", "media",
+    "kodansha", "shueisha", "yen", "press", "animenewsnetwork", "ann", "screenrant", "studio"
+}
+
+# Skipped at the start of a headline, after the publisher
+LEAD_WORDS = {
+    "announces", "announced", "reveals", "revealed", "confirms", "confirmed", "unveils", "adds",
+    "acquires", "licenses", "streams", "to", "will", "sets", "drops", "shares", "the", "a", "an",
+    "new", "more", "its", "upcoming", "latest", "first", "spring", "summer", "fall", "winter"
+}
+
+# Real quote pairs only: an apostrophe inside a word ("Don't", "Man's") is not a quote
+QUOTED_RE = re.compile(r"(?<!\w)['\"“‘](.+?)['\"”’](?!\w)")
+
+def normalize_series_title(title):
+    """
+    Best-effort series name from a headline, used as the fallback-art cache key.
+    'Frieren Season 2 Reveals New Trailer' -> 'frieren'
+    Returns '' when no series name can be found.
+    """
+    quoted = QUOTED_RE.search(title)
+    text = quoted.group(1) if quoted else re.split(r"[:|–—]| - ", title)[0]
+
+    # "Frieren's" -> "Frieren", "Don't" -> "Dont"
+    text = re.sub(r"['’]s\b", "", text.lower())
+    text = re.sub(r"['’]", "", text)
+    tokens = re.findall(r"[a-z0-9]+", text)
+
+    if not quoted:
+        while tokens and (tokens[0] in PUBLISHER_WORDS or tokens[0] in LEAD_WORDS or tokens[0].isdigit()):
+            tokens.pop(0)
+
+    words = []
+    for word in tokens:
+        if word in SERIES_CUT_WORDS:
+            break
+        words.append(word)
+    return "-".join(words[:6])
+
+def detect_category(title):
+    words = set(re.findall(r"[a-z0-9-]+", title.lower()))
+    for category, (keywords, _) in CATEGORY_ART.items():
+        if words.intersection(keywords):
+            return category
+    return "generic"
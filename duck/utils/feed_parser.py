@@ -0,0 +1,209 @@
+import asyncio
+import aiohttp
+import logging
+import feedparser
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from config import FEED_PARSER_ENGINE
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+CHUNK_SIZE = 16 * 1024
+
+class FeedEntry:
+    """
+    Compact feed entry: only the fields check_feeds reads.
+    Supports `"media_content" in entry` like feedparser's FeedParserDict.
+    """
+    __slots__ = ("link", "title", "summary", "media_content", "links", "published_parsed")
+
+    def __init__(self, link=None, title="", summary="", media_content=None, links=None, published_parsed=None):
+        self.link = link
+        self.title = title
+        self.summary = summary
+        self.media_content = media_content or []
+        self.links = links or []
+        self.published_parsed = published_parsed
+
+    def __contains__(self, key):
+        return key in self.__slots__ and bool(getattr(self, key))
+
+    @classmethod
+    def from_feedparser(cls, entry):
+        return cls(
+            link=entry.get("link"),
+            title=entry.get("title", ""),
+            summary=entry.get("summary", ""),
+            media_content=entry.get("media_content"),
+            links=entry.get("links"),
+            published_parsed=entry.get("published_parsed") or entry.get("updated_parsed")
+        )
+
+def parse_date(text):
+    """RFC 822 (RSS) or ISO 8601 (Atom) -> UTC struct_time, like feedparser's *_parsed."""
+    text = text.strip()
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not dt.tzinfo:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.utctimetuple()
+
+def build_entry(elem):
+    """RSS <item> / Atom <entry> element -> FeedEntry."""
+    entry = FeedEntry()
+    content = ""
+    for child in elem:
+        if not isinstance(child.tag, str):
+            continue  # Comments / processing instructions
+        qname = etree.QName(child)
+        tag = qname.localname
+
+        if qname.namespace == MEDIA_NS:
+            if tag == "content":
+                entry.media_content.append(dict(child.attrib))
+        elif (tag == "content" or (qname.namespace == CONTENT_NS and tag == "encoded")) and not content:
+            # Atom <content> / RSS <content:encoded>
+            content = "".join(child.itertext()).strip()
+        elif tag == "title":
+            entry.title = "".join(child.itertext()).strip()
+        elif tag == "link":
+            href = child.get("href")
+            if href:  # Atom
+                rel = child.get("rel", "alternate")
+                entry.links.append({"rel": rel, "type": child.get("type", ""), "href": href})
+                if rel == "alternate" and not entry.link:
+                    entry.link = href
+            elif child.text and not entry.link:  # RSS
+                entry.link = child.text.strip()
+                entry.links.append({"rel": "alternate", "type": "text/html", "href": entry.link})
+        elif tag == "enclosure" and child.get("url"):
+            entry.links.append({"rel": "enclosure", "type": child.get("type", ""), "href": child.get("url")})
+        elif tag in ("description", "summary") and not entry.summary:
+            entry.summary = "".join(child.itertext()).strip()
+        elif tag in ("pubDate", "published", "updated", "date") and not entry.published_parsed and child.text:
+            entry.published_parsed = parse_date(child.text)
+
+    # Like feedparser: content-only entries still get a summary (used when scraping fails)
+    if not entry.summary:
+        entry.summary = content
+    return entry
+
+class StreamParser:
+    """
+    Incremental RSS/Atom parser: feed() it chunks, it returns finished entries.
+    Stops (done=True) at `limit` entries or at the first link in `seen`.
+    """
+    def __init__(self, limit=None, seen=()):
+        self.limit = limit
+        self.seen = seen
+        self.count = 0
+        self.done = False
+        self.parser = etree.XMLPullParser(
+            events=("end",), tag=("{*}item", "{*}entry"),
+            resolve_entities=False, no_network=True
+        )
+
+    def feed(self, chunk):
+        self.parser.feed(chunk)
+        return self.read()
+
+    def close(self):
+        if self.done:
+            return []
+        self.parser.close()
+        return self.read()
+
+    def read(self):
+        entries = []
+        for _, elem in self.parser.read_events():
+            if self.done:
+                break
+            entry = build_entry(elem)
+
+            # Free memory as we go
+            elem.clear()
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+            if not entry.link:
+                continue
+            if entry.link in self.seen:
+                self.done = True
+                break
+            entries.append(entry)
+            self.count += 1
+            if self.limit and self.count >= self.limit:
+                self.done = True
+        return entries
+
+def parse_bytes(data, limit=None, seen=()):
+    """Sync helper (benchmarks / already downloaded feeds)."""
+    stream = StreamParser(limit, seen)
+    entries = []
+    for start in range(0, len(data), CHUNK_SIZE):
+        entries.extend(stream.feed(data[start:start + CHUNK_SIZE]))
+        if stream.done:
+            return entries
+    return entries + stream.close()
+
+class FeedEngine:
+    def __init__(self, engine=FEED_PARSER_ENGINE):
+        self.engine = engine
+        if engine == "stream" and etree is None:
+            logger.warning("⚠️ lxml not installed! Using feedparser for RSS.")
+            self.engine = "feedparser"
+
+    async def parse(self, url, limit=None, seen=()):
+        """
+        Returns up to `limit` newest entries, stopping at the first already-seen link.
+        Malformed feeds (or engine='feedparser') go through feedparser instead.
+        """
+        if self.engine == "stream":
+            try:
+                return await self.parse_stream(url, limit, seen)
+            except Exception as e:
+                logger.warning(f"⚠️ Stream parse failed for {url} ({e}). Using feedparser.")
+
+        feed = await asyncio.to_thread(feedparser.parse, url)
+        entries = []
+        for raw in feed.entries:
+            entry = FeedEntry.from_feedparser(raw)
+            if not entry.link:
+                continue
+            if entry.link in seen:
+                break
+            entries.append(entry)
+            if limit and len(entries) >= limit:
+                break
+        return entries
+
+    async def parse_stream(self, url, limit, seen):
+        stream = StreamParser(limit, seen)
+        entries = []
+        timeout = aiohttp.ClientTimeout(total=30)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(url, headers={"User-Agent": feedparser.USER_AGENT}) as resp:
+                if resp.status != 200:
+                    raise ValueError(f"HTTP {resp.status}")
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    entries.extend(stream.feed(chunk))
+                    if stream.done:
+                        # Don't download the rest of the feed
+                        return entries
+        return entries + stream.close()
+
+feed_engine = FeedEngine()
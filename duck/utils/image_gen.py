@@ -4,7 +4,8 @@ import logging
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont, ImageEnhance
 from huggingface_hub import InferenceClient
-from config import HF_TOKEN
+from config import HF_TOKEN, FALLBACK_CACHE_DIR, FALLBACK_CACHE_MAX_FILES, FALLBACK_WARM_INTERVAL
+from duck.utils.fallback_art import CATEGORY_ART, normalize_series_title, detect_category
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +27,10 @@ class ImageGen:
         self.FONTS_PATH = os.path.join(self.ASSET_PATH, "fonts")
         os.makedirs(self.FONTS_PATH, exist_ok=True)
 
+        # 3. Fallback art cache (generated images reused across stories)
+        os.makedirs(FALLBACK_CACHE_DIR, exist_ok=True)
+        self.pending_series = {}  # cache key -> prompt, generated in the background
+
     async def generate_ai_image(self, prompt):
         """
         Uses Stable Diffusion to generate an image from text.
@@ -56,6 +61,93 @@ class ImageGen:
             logger.error(f"❌ Stable Diffusion Failed: {e}")
             return None
 
+    # --- Fallback Art Cache ---
+    def cache_path(self, key):
+        return os.path.join(FALLBACK_CACHE_DIR, f"{key}.jpg")
+
+    def load_cached(self, key):
+        path = self.cache_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            img = Image.open(path)
+            img.load()
+            return img
+        except Exception as e:
+            logger.error(f"Cached Art Broken ({key}): {e}")
+            return None
+
+    def save_cached(self, key, img):
+        img.convert("RGB").resize((1280, 720), Image.Resampling.LANCZOS).save(self.cache_path(key), format="JPEG", quality=90)
+
+        # Keep the cache bounded (categories are never pruned)
+        files = [os.path.join(FALLBACK_CACHE_DIR, f) for f in os.listdir(FALLBACK_CACHE_DIR) if f.startswith("series-")]
+        if len(files) > FALLBACK_CACHE_MAX_FILES:
+            files.sort(key=os.path.getmtime)
+            for path in files[:len(files) - FALLBACK_CACHE_MAX_FILES]:
+                os.remove(path)
+
+    async def get_fallback_art(self, title):
+        """
+        Art for articles without an image, never blocks on Stable Diffusion:
+        1. Cached art for the same series
+        2. Cached category background (series art is queued for the background job)
+        3. Cold cache -> None (post goes out as text, warm_cache fills the gaps)
+        """
+        series = normalize_series_title(title)
+        series_key = f"series-{series}" if series else None
+        category_key = f"category-{detect_category(title)}"
+
+        if series_key:
+            img = self.load_cached(series_key)
+            if img:
+                logger.info(f"🖼 Using cached art for: {series}")
+                return img
+
+        # Missing categories are picked up by next_warm_job on their own
+        if series_key and self.client:
+            self.pending_series[series_key] = series.replace("-", " ")
+
+        img = self.load_cached(category_key)
+        if img:
+            logger.info(f"🖼 Using cached {category_key} art")
+            return img
+
+        logger.info("⚠️ Fallback art cache is cold. Posting without an image for now.")
+        return None
+
+    def next_warm_job(self):
+        """Missing category backgrounds first, then series art requested by the hot path."""
+        for category, (_, prompt) in CATEGORY_ART.items():
+            key = f"category-{category}"
+            if not os.path.exists(self.cache_path(key)):
+                return key, prompt
+        if self.pending_series:
+            return self.pending_series.popitem()
+        return None
+
+    async def warm_cache(self, is_idle):
+        """Background job: pre-generates fallback art while no news is waiting."""
+        if not self.client: return
+        logger.info("🎨 Fallback Art Warmer Started...")
+        while True:
+            await asyncio.sleep(FALLBACK_WARM_INTERVAL)
+            if not is_idle():
+                continue
+            try:
+                job = self.next_warm_job()
+                if not job:
+                    continue
+                key, prompt = job
+                if os.path.exists(self.cache_path(key)):
+                    continue
+                img = await self.generate_ai_image(prompt)
+                if img:
+                    await asyncio.to_thread(self.save_cached, key, img)
+                    logger.info(f"🖼 Cached fallback art: {key}")
+            except Exception as e:
+                logger.error(f"Art Warmer Error: {e}")
+
     def get_font(self, size=40):
         try:
             fonts = [f for f in os.listdir(self.FONTS_PATH) if f.endswith(".ttf")]
@@ -115,7 +207,7 @@ class ImageGen:
         """
         Main Handler:
         1. Tries to download real news image.
-        2. If NO image -> Generates AI Art (Stable Diffusion).
+        2. If NO image -> Cached fallback art (None on a cold cache).
         3. Applies Watermark & Title.
         """
         img = None
@@ -132,10 +224,10 @@ class ImageGen:
             except Exception as e:
                 logger.error(f"Download Failed: {e}")
 
-        # B. Fallback: Use Stable Diffusion
+        # B. Fallback: Cached art
         if not img:
-            logger.info("⚠️ No image found. Generating with Stable Diffusion...")
-            img = await self.generate_ai_image(title)
+            logger.info("⚠️ No image found. Using fallback art...")
+            img = await self.get_fallback_art(title)
 
         # If everything failed, give up
         if not img: return None
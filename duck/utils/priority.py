@@ -0,0 +1,90 @@
+import re
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from config import PRIORITY_KEYWORDS, SOURCE_WEIGHTS, PRIORITY_AGING_PER_MIN
+
+logger = logging.getLogger(__name__)
+
+STOP_WORDS = {"the", "a", "an", "of", "and", "to", "in", "for", "on", "is", "with", "at", "by", "from", "anime", "news"}
+
+def title_words(title):
+    words = re.findall(r"[a-z0-9]+", title.lower())
+    return {w for w in words if w not in STOP_WORDS and len(w) > 1}
+
+def count_coverage(titles_by_feed, title, threshold=0.5):
+    """How many feeds carry a story with a similar title (Jaccard on title words)."""
+    words = title_words(title)
+    if not words:
+        return 1
+    feeds = 0
+    for titles in titles_by_feed.values():
+        for other in titles:
+            other_words = title_words(other)
+            if other_words and len(words & other_words) / len(words | other_words) >= threshold:
+                feeds += 1
+                break
+    return max(feeds, 1)
+
+def importance_score(title, source_name, coverage=1):
+    """
+    How big the story is, independent of its age:
+    - Keyword stems in title
+    - Source weight
+    - Coverage (+10 per extra feed carrying the story)
+    Compared against PRIORITY_AI_FALLBACK_BELOW under AI quota pressure.
+    """
+    words = set(re.findall(r"[a-z]+", title.lower()))
+    # Prefix match so headline verb forms count ("announces", "delays", "trailers")
+    score = sum(weight for stem, weight in PRIORITY_KEYWORDS.items() if any(w.startswith(stem) for w in words))
+    score += SOURCE_WEIGHTS.get(source_name, 0)
+    score += (coverage - 1) * 10
+    return score
+
+def score_entry(title, source_name, published=None, coverage=1):
+    """Queue order: importance + recency (fresh news up to +20, fades over 10 hours)."""
+    score = importance_score(title, source_name, coverage)
+    if published:
+        # Clamp: a future pubDate (e.g. JST labelled +0000) counts as brand new, not newer
+        hours_old = max(0.0, (datetime.now(timezone.utc) - published).total_seconds() / 3600)
+        score += max(0.0, 20 - hours_old * 2)
+    return score
+
+class NewsQueue:
+    """
+    Priority queue in front of the enrichment/publish stages.
+    Effective priority = score + aging, so low scores still get their turn.
+    """
+    def __init__(self, aging_per_min=PRIORITY_AGING_PER_MIN):
+        self.aging_per_min = aging_per_min
+        self.items = {}  # link -> (score, queued_at, entry, importance)
+        self.event = asyncio.Event()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, link):
+        return link in self.items
+
+    def effective_priority(self, score, queued_at):
+        return score + (time.monotonic() - queued_at) / 60 * self.aging_per_min
+
+    def push(self, entry, score, importance=0):
+        if entry.link in self.items:
+            return
+        self.items[entry.link] = (score, time.monotonic(), entry, importance)
+        self.event.set()
+
+    async def pop(self):
+        """Waits for an item, then returns (entry, importance) of the best one."""
+        while not self.items:
+            self.event.clear()
+            await self.event.wait()
+
+        # Queue is only a handful of entries per poll, a scan is cheaper than re-heapifying for aging
+        link = max(self.items, key=lambda k: self.effective_priority(*self.items[k][:2]))
+        _, _, entry, importance = self.items.pop(link)
+        return entry, importance
+
+news_queue = NewsQueue()
@@ -1,18 +1,63 @@
+import asyncio
 import aiohttp
+import hashlib
 import logging
 from io import BytesIO
+from PIL import Image
+from config import CATBOX_PHASH_DISTANCE
+from duck.database import db
 
 logger = logging.getLogger(__name__)
 
+def perceptual_hash(image_data):
+    """
+    dHash (64 bit, hex): survives re-encoding / resizing,
+    so the same key visual from different outlets matches.
+    """
+    img = Image.open(BytesIO(image_data))
+    img.draft("L", (64, 64))  # Fast JPEG downscale while decoding
+    img = img.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = list(img.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+def hash_distance(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
 class CatboxUploader:
     def __init__(self):
         self.api_url = "https://catbox.moe/user/api.php"
 
-    async def upload_image(self, image_data):
+    async def upload_image(self, image_data, source_url=None, match_similar=True):
         """
         Uploads binary image data (bytes) to Catbox.
+        Skips the upload if the same (or a near-identical) image was uploaded before.
+        match_similar=False -> exact bytes only (our thumbnails differ just by the title bar).
         Returns the new URL (str) or None.
         """
+        sha256 = hashlib.sha256(image_data).hexdigest()
+        phash = None
+        if match_similar:
+            try:
+                phash = await asyncio.to_thread(perceptual_hash, image_data)
+            except Exception as e:
+                logger.warning(f"Perceptual Hash Failed: {e}")
+
+        # 1. Already uploaded? (exact bytes, then perceptual match)
+        try:
+            existing_url = await self.find_existing(sha256, phash)
+            if existing_url:
+                logger.info(f"♻️ Reusing Catbox upload: {existing_url}")
+                if source_url:
+                    await db.add_upload_source(existing_url, source_url)
+                return existing_url
+        except Exception as e:
+            logger.error(f"Upload Index Error: {e}")
+
+        # 2. Upload
         try:
             data = aiohttp.FormData()
             data.add_field('reqtype', 'fileupload')
@@ -22,8 +67,7 @@ class CatboxUploader:
             async with aiohttp.ClientSession() as session:
                 async with session.post(self.api_url, data=data) as response:
                     if response.status == 200:
-                        url = await response.text()
-                        return url.strip()
+                        url = (await response.text()).strip()
                     else:
                         logger.error(f"Catbox Upload Failed: {response.status}")
                         return None
@@ -31,19 +75,45 @@ class CatboxUploader:
             logger.error(f"Upload Error: {e}")
             return None
 
+        # 3. Remember it for next time
+        try:
+            await db.add_upload(sha256, phash, url, source_url)
+        except Exception as e:
+            logger.error(f"Upload Index Error: {e}")
+        return url
+
+    async def find_existing(self, sha256, phash):
+        doc = await db.find_upload(sha256=sha256, phash=phash)
+        if doc:
+            return doc["url"]
+
+        if phash and CATBOX_PHASH_DISTANCE > 0:
+            for other, url in await db.get_recent_phashes():
+                if hash_distance(phash, other) <= CATBOX_PHASH_DISTANCE:
+                    return url
+        return None
+
     async def upload_from_url(self, image_url):
         """
         Downloads image from original source -> Uploads to Catbox.
+        Source URLs seen before skip the download entirely.
         """
+        try:
+            doc = await db.find_upload(source_url=image_url)
+            if doc:
+                logger.info(f"♻️ Reusing Catbox upload: {doc['url']}")
+                return doc["url"]
+        except Exception as e:
+            logger.error(f"Upload Index Error: {e}")
+
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get(image_url) as resp:
                     if resp.status == 200:
                         image_bytes = await resp.read()
-                        return await self.upload_image(image_bytes)
+                        return await self.upload_image(image_bytes, source_url=image_url)
         except Exception as e:
             logger.error(f"Download Error: {e}")
             return None
 
 catbox = CatboxUploader()
-
@@ -1,12 +1,16 @@
+import sys
 import asyncio
 import logging
 import feedparser
+from datetime import datetime, timedelta, timezone
 from pyrogram import Client, filters, idle
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 
 # Import Config & Tools
 from config import API_ID, API_HASH, BOT_TOKEN, NEWS_FEED_URLS, CHANNEL_ID, OWNER_ID
+from config import BACKFILL_CONCURRENCY, BACKFILL_PUBLISH_DELAY, BACKFILL_MAX_PAGES
+from config import PRIORITY_AI_FALLBACK_BELOW, CATBOX_UPLOAD_THUMBNAIL, POST_RETRIES
 from duck.database import db
 from duck.utils.ai_helper import ai_editor
 from duck.utils.image_gen import image_generator
@@ -14,12 +18,20 @@ from duck.utils.graph_helper import graph_maker
 from duck.utils.text_styler import styler
 from duck.utils.scraper import scraper
 from duck.utils.uploader import catbox
+from duck.utils.priority import news_queue, score_entry, importance_score, count_coverage
+from duck.utils.feed_parser import feed_engine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Client("AnimeNewsBot", api_id=API_ID, api_hash=API_HASH, bot_token=BOT_TOKEN, plugins=dict(root="plugins"))
 
+# Links known to be posted (refreshed every poll) - the feed engine stops reading there
+recent_posted = set()
+# Entries that failed to post: link -> (entry, attempts). Re-queued every poll,
+# since the feed engine may stop at a newer posted link before reaching them.
+failed_entries = {}
+
 def get_source_name(url):
     try:
         domain = urlparse(url).netloc
@@ -27,127 +39,344 @@ def get_source_name(url):
     except:
         return "Anime News"
 
+def extract_rss_image(entry):
+    """Pulls an image URL out of the RSS entry itself (used when scraping fails)."""
+    # ROBUST IMAGE EXTRACTION (Fixes the 'url' crash)
+    try:
+        if "media_content" in entry and entry.media_content:
+            return entry.media_content[0].get("url")
+        elif "links" in entry:
+            for l in entry.links:
+                if l.get("type", "").startswith("image"):
+                    return l.get("href")
+    except Exception as e:
+        logger.error(f"Image Extraction Error: {e}")
+    return None
+
+async def process_entry(entry, use_ai=True):
+    """
+    Scrape -> Thumbnail -> Upload -> AI -> Telegraph.
+    Returns everything needed to publish the post.
+    """
+    link = entry.link
+    title = entry.title
+
+    logger.info(f"🆕 Processing: {title}")
+    source_name = get_source_name(link)
+
+    # 2. Scrape Content (sync HTTP, keep it off the event loop)
+    scraped = await asyncio.to_thread(scraper.scrape, link)
+    
+    if scraped:
+        full_text = scraped['text']
+        original_image_url = scraped['image']
+        logger.info("✅ Scraped successfully")
+    else:
+        logger.warning(f"⚠️ Scraping failed/skipped for {link}. Using RSS Fallback.")
+        full_text = getattr(entry, "summary", "Read full article for details.")
+        original_image_url = extract_rss_image(entry)
+
+    # 3. Generate Thumbnail (cached fallback art if there is no image, never waits on SD)
+    photo_file = None
+    try:
+        photo_file = await image_generator.create_thumbnail(original_image_url, title)
+    except Exception as e:
+        logger.error(f"Thumbnail Gen Error: {e}")
+
+    # 4. Upload to Catbox (Only if we have an image)
+    catbox_url = None
+    if CATBOX_UPLOAD_THUMBNAIL and photo_file:
+        # Already rendered + compressed, fewer bytes than the raw source
+        catbox_url = await catbox.upload_image(photo_file.getvalue(), match_similar=False)
+    elif original_image_url:
+        catbox_url = await catbox.upload_from_url(original_image_url)
+    
+    # Fallback for Telegraph
+    final_image_url = catbox_url if catbox_url else original_image_url
+    
+    # 5. AI Processing
+    # Safely handle missing image in AI prompt
+    caption_task = ai_editor.generate_hype_caption(title, getattr(entry, "summary", ""), source_name, use_ai=use_ai)
+    html_task = ai_editor.format_article_html(title, full_text, final_image_url or "https://telegra.ph/file/placeholder.jpg", use_ai=use_ai)
+    
+    caption_text, formatted_html = await asyncio.gather(caption_task, html_task)
+
+    # 6. Create Telegraph Page
+    telegraph_url = await asyncio.to_thread(graph_maker.create_page, title, formatted_html)
+
+    # 7. Build Message
+    bullet = styler.get_random_bullet()
+    separator = styler.get_separator()
+    
+    footer = (
+        f"{separator}\n"
+        f"🗞 **Source:** {source_name}\n"
+        f"💎 **DOT NeWZ Network**"
+    )
+
+    final_caption = f"{bullet} {caption_text}\n\n{footer}"
+    
+    btn_text = styler.convert("READ FULL ARTICLE", "small_caps")
+    buttons = InlineKeyboardMarkup([
+        [InlineKeyboardButton(f"⌲ {btn_text}", url=telegraph_url or link)]
+    ])
+
+    return {
+        "link": link,
+        "title": title,
+        "caption": final_caption,
+        "photo": photo_file,
+        "buttons": buttons
+    }
+
+async def publish_post(post):
+    """8. Send & SAVE (Critical Step). Returns True if the post is out (now or already)."""
+    try:
+        # Backfill and the live loop run side by side, the other one may have been faster
+        if await db.is_posted(post["link"]):
+            logger.info(f"⏭ Already posted: {post['title']}")
+            return True
+
+        if post["photo"]:
+            await app.send_photo(CHANNEL_ID, post["photo"], caption=post["caption"], reply_markup=post["buttons"])
+        else:
+            await app.send_message(CHANNEL_ID, post["caption"], reply_markup=post["buttons"])
+        
+        logger.info(f"🚀 Posted: {post['title']}")
+        await db.add_post(post["link"], post["title"])
+        recent_posted.add(post["link"])
+        failed_entries.pop(post["link"], None)
+        return True
+
+    except Exception as e:
+        logger.error(f"Telegram Send Error: {e}")
+        return False
+
 async def check_feeds():
+    """Producer: polls feeds and pushes new entries into the priority queue."""
+    global recent_posted
     logger.info("🔄 RSS Checker Started...")
     while True:
+        candidates = []
+        titles_by_feed = {}
         for url in NEWS_FEED_URLS:
             try:
-                feed = feedparser.parse(url)
-                if not feed.entries:
+                entries = await feed_engine.parse(url, limit=3, seen=recent_posted)
+                if not entries:
                     continue
 
-                for entry in feed.entries[:3]:
-                    link = entry.link
-                    title = entry.title
-                    
-                    # 1. Check Database (Skip if already posted)
-                    if await db.is_posted(link):
-                        continue
-                    
-                    logger.info(f"🆕 Processing: {title}")
-                    source_name = get_source_name(link)
-
-                    # 2. Scrape Content
-                    scraped = scraper.scrape(link)
-                    
-                    if scraped:
-                        full_text = scraped['text']
-                        original_image_url = scraped['image']
-                        logger.info("✅ Scraped successfully")
-                    else:
-                        logger.warning(f"⚠️ Scraping failed/skipped for {link}. Using RSS Fallback.")
-                        full_text = getattr(entry, "summary", "Read full article for details.")
-                        
-                        # ROBUST IMAGE EXTRACTION (Fixes the 'url' crash)
-                        original_image_url = None
-                        try:
-                            if "media_content" in entry and entry.media_content:
-                                original_image_url = entry.media_content[0].get("url")
-                            elif "links" in entry:
-                                for l in entry.links:
-                                    if l.get("type", "").startswith("image"):
-                                        original_image_url = l.get("href")
-                                        break
-                        except Exception as e:
-                            logger.error(f"Image Extraction Error: {e}")
-
-                    # 3. Upload to Catbox (Only if we have an image)
-                    catbox_url = None
-                    if original_image_url:
-                        catbox_url = await catbox.upload_from_url(original_image_url)
-                    
-                    # Fallback for Telegraph
-                    final_image_url = catbox_url if catbox_url else original_image_url
-                    
-                    # 4. AI Processing
-                    # Safely handle missing image in AI prompt
-                    caption_task = ai_editor.generate_hype_caption(title, getattr(entry, "summary", ""), source_name)
-                    html_task = ai_editor.format_article_html(title, full_text, final_image_url or "https://telegra.ph/file/placeholder.jpg")
-                    
-                    caption_text, formatted_html = await asyncio.gather(caption_task, html_task)
-
-                    # 5. Create Telegraph Page
-                    telegraph_url = graph_maker.create_page(title, formatted_html)
-
-                    # 6. Generate Thumbnail (If possible)
-                    photo_file = None
-                    if original_image_url:
-                        try:
-                            photo_file = await image_generator.create_thumbnail(original_image_url, title)
-                        except Exception as e:
-                            logger.error(f"Thumbnail Gen Error: {e}")
-
-                    # 7. Build Message
-                    bullet = styler.get_random_bullet()
-                    separator = styler.get_separator()
-                    
-                    footer = (
-                        f"{separator}\n"
-                        f"🗞 **Source:** {source_name}\n"
-                        f"💎 **DOT NeWZ Network**"
-                    )
-
-                    final_caption = f"{bullet} {caption_text}\n\n{footer}"
-                    
-                    btn_text = styler.convert("READ FULL ARTICLE", "small_caps")
-                    buttons = InlineKeyboardMarkup([
-                        [InlineKeyboardButton(f"⌲ {btn_text}", url=telegraph_url or link)]
-                    ])
-
-                    # 8. Send & SAVE (Critical Step)
-# ... inside check_feeds() loop ...
-
-                    # ... (Send & Save Logic) ...
-                    try:
-                        if photo_file:
-                            await app.send_photo(CHANNEL_ID, photo_file, caption=final_caption, reply_markup=buttons)
-                        else:
-                            await app.send_message(CHANNEL_ID, final_caption, reply_markup=buttons)
-                        
-                        logger.info(f"🚀 Posted: {title}")
-                        await db.add_post(link, title)
-
-                        # --- CRITICAL FIX: SLOW DOWN ---
-                        logger.info("⏳ Cooling down for 15 seconds to respect AI Limits...")
-                        await asyncio.sleep(15) 
-                        # -------------------------------
-
-                    except Exception as e:
-                        logger.error(f"Telegram Send Error: {e}")
+                titles_by_feed[url] = [e.title for e in entries]
+                candidates.extend(entries)
 
             except Exception as e:
                 logger.error(f"Feed Loop Error: {e}")
+
+        # Retry failures even if the feed engine stopped before reaching them
+        fetched = {e.link for e in candidates}
+        candidates.extend(entry for link, (entry, _) in failed_entries.items() if link not in fetched)
+
+        try:
+            # 1. Check Database (Skip if already posted) - one query per poll
+            unposted = await db.filter_unposted([e.link for e in candidates])
+            for link in [l for l in failed_entries if l not in unposted]:
+                del failed_entries[link]
+            posted_now = {e.link for e in candidates if e.link not in unposted}
+            # Keep it small, feeds only ever need their newest few links
+            recent_posted = recent_posted | posted_now if len(recent_posted) < 500 else posted_now
+
+            for entry in candidates:
+                if entry.link not in unposted or entry.link in news_queue:
+                    continue
+                coverage = count_coverage(titles_by_feed, entry.title)
+                source_name = get_source_name(entry.link)
+                score = score_entry(entry.title, source_name, entry_time(entry), coverage)
+                news_queue.push(entry, score, importance_score(entry.title, source_name, coverage))
+                logger.info(f"📥 Queued ({score:.0f}): {entry.title}")
+
+        except Exception as e:
+            logger.error(f"Queue Error: {e}")
         
         logger.info("💤 Sleeping for 60 seconds...")
         await asyncio.sleep(60)
 
-async def main():
+def record_failure(entry):
+    """Keeps a failed entry for the next poll, up to POST_RETRIES attempts."""
+    _, attempts = failed_entries.get(entry.link, (entry, 0))
+    if attempts + 1 >= POST_RETRIES:
+        failed_entries.pop(entry.link, None)
+        logger.warning(f"❌ Giving up after {POST_RETRIES} attempts: {entry.title}")
+    else:
+        failed_entries[entry.link] = (entry, attempts + 1)
+
+async def publisher_worker():
+    """Consumer: always processes the highest-priority entry next."""
+    logger.info("📤 Publisher Started...")
+    while True:
+        entry, importance = await news_queue.pop()
+        try:
+            # Might have been posted by a backfill run meanwhile
+            if await db.is_posted(entry.link):
+                continue
+
+            # Under AI quota pressure, minor stories take the non-AI fallback path
+            # (importance leaves out recency/aging, which would lift every live item over the bar)
+            use_ai = not (importance < PRIORITY_AI_FALLBACK_BELOW and ai_editor.is_under_pressure())
+            if not use_ai:
+                logger.info(f"🪫 AI quota pressure, using fallback for: {entry.title}")
+
+            post = await process_entry(entry, use_ai=use_ai)
+
+            if not await publish_post(post):
+                record_failure(entry)
+            elif use_ai:
+                # --- CRITICAL FIX: SLOW DOWN ---
+                logger.info("⏳ Cooling down for 15 seconds to respect AI Limits...")
+                await asyncio.sleep(15) 
+                # -------------------------------
+
+        except Exception as e:
+            logger.error(f"Publisher Error: {e}")
+            record_failure(entry)
+
+# --- Backfill / Catch-up Mode ---
+
+def parse_since(value):
+    """'6' / '6h' -> 6 hours ago, '2d' -> 2 days ago, '2024-05-01[T10:00]' -> that time (UTC)."""
+    value = value.strip().lower()
+    now = datetime.now(timezone.utc)
+    if value.endswith("d") and value[:-1].isdigit():
+        return now - timedelta(days=int(value[:-1]))
+    if value.rstrip("h").isdigit():
+        return now - timedelta(hours=int(value.rstrip("h")))
+    since = datetime.fromisoformat(value.upper())
+    return since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+
+def get_backfill_since():
+    """Reads --backfill from argv before the client starts; exits with usage on bad input."""
+    if "--backfill" not in sys.argv:
+        return None
+    index = sys.argv.index("--backfill") + 1
+    try:
+        return parse_since(sys.argv[index])
+    except (IndexError, ValueError):
+        sys.exit("Usage: python main.py --backfill <hours>[h] | <days>d | YYYY-MM-DD[THH:MM]")
+
+def entry_time(entry):
+    parsed = getattr(entry, "published_parsed", None) or getattr(entry, "updated_parsed", None)
+    if not parsed:
+        return None
+    return datetime(*parsed[:6], tzinfo=timezone.utc)
+
+def next_page_url(feed, url, page):
+    """
+    Archive pagination:
+    1. RFC 5005 <link rel="next"> if the feed advertises one.
+    2. WordPress style ?paged=N otherwise.
+    """
+    for l in feed.feed.get("links", []):
+        if l.get("rel") == "next" and l.get("href"):
+            return l["href"]
+    parts = urlparse(url)
+    query = dict(parse_qsl(parts.query))
+    query["paged"] = str(page + 1)
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+async def collect_backfill_entries(url, since):
+    """Reads the full feed (plus archive pages) and returns entries newer than `since`."""
+    entries = []
+    seen_links = set()
+    page_url = url
+
+    for page in range(1, BACKFILL_MAX_PAGES + 1):
+        feed = await asyncio.to_thread(feedparser.parse, page_url)
+        if not feed.entries:
+            break
+
+        fresh = [e for e in feed.entries if getattr(e, "link", None) and e.link not in seen_links]
+        # Feeds without pagination just return page 1 again -> stop
+        if not fresh:
+            break
+
+        reached_since = False
+        for entry in fresh:
+            seen_links.add(entry.link)
+            published = entry_time(entry)
+            # Undated entries are kept; the history check stops reposts
+            if published and published < since:
+                reached_since = True
+                continue
+            entries.append(entry)
+
+        if reached_since:
+            break
+        page_url = next_page_url(feed, page_url, page)
+
+    return entries
+
+async def backfill(since):
+    """
+    Catch-up after downtime:
+    - Full feeds + archives since `since`
+    - One bulk history query for dedup
+    - Parallel processing, separately rate-limited publishing
+    """
+    logger.info(f"⏪ Backfill Started (since {since.isoformat()})...")
+
+    entries = {}
+    for url in NEWS_FEED_URLS:
+        try:
+            for entry in await collect_backfill_entries(url, since):
+                entries.setdefault(entry.link, entry)
+        except Exception as e:
+            logger.error(f"Backfill Feed Error ({url}): {e}")
+
+    unposted = await db.filter_unposted(list(entries))
+    # Oldest first so the channel stays in chronological order
+    pending = sorted(
+        (e for link, e in entries.items() if link in unposted),
+        key=lambda e: entry_time(e) or datetime.now(timezone.utc)
+    )
+    logger.info(f"⏪ {len(entries)} entries found, {len(pending)} not posted yet.")
+
+    semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+    async def prepare(entry):
+        async with semaphore:
+            try:
+                # Same AI budget as the live loop: fall back when quota is tight
+                return await process_entry(entry, use_ai=not ai_editor.is_under_pressure())
+            except Exception as e:
+                logger.error(f"Backfill Processing Error ({entry.link}): {e}")
+                return None
+
+    tasks = [asyncio.create_task(prepare(e)) for e in pending]
+    posted = 0
+    # Publish in order as each post becomes ready
+    for task in tasks:
+        post = await task
+        if post and await publish_post(post):
+            posted += 1
+            await asyncio.sleep(BACKFILL_PUBLISH_DELAY)
+
+    logger.info(f"⏪ Backfill Finished: {posted}/{len(pending)} posted.")
+
+async def main(backfill_since=None):
     await app.start()
+    await db.ensure_indexes()
+    asyncio.create_task(db.user_flush_loop())
     print("🔥 DOT NeWZ Bot is Online!")
+    # python main.py --backfill 12h  (or 2d / 2024-05-01)
+    # Runs next to the live loop so breaking news isn't stuck behind a long catch-up
+    if backfill_since:
+        asyncio.create_task(backfill(backfill_since))
     asyncio.create_task(check_feeds())
+    asyncio.create_task(publisher_worker())
+    asyncio.create_task(image_generator.warm_cache(lambda: len(news_queue) == 0))
     await idle()
+    await db.flush_users()
     await app.stop()
 
 if __name__ == "__main__":
-    app.run(main())
+    backfill_since = get_backfill_since()
+    app.run(main(backfill_since))
                     
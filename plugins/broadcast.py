@@ -0,0 +1,151 @@
+# plugins/broadcast.py
+import time
+import asyncio
+import logging
+from pyrogram import Client, filters
+from pyrogram.errors import FloodWait, UserIsBlocked, InputUserDeactivated, Unauthorized
+from config import OWNER_ID, BROADCAST_RATE, BROADCAST_CONCURRENCY, BROADCAST_BATCH_SIZE
+from duck.database import db
+
+logger = logging.getLogger(__name__)
+
+# Only one broadcast at a time
+broadcast_task = None
+
+class RateLimiter:
+    """Spaces sends to `rate` per second. A FloodWait pauses every sender."""
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.next_slot = 0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds):
+        self.next_slot = max(self.next_slot, time.monotonic() + seconds)
+
+async def send_one(client, state, user_id, limiter, semaphore):
+    """
+    Returns 'ok', 'blocked' or 'failed'.
+    FloodWait is retried until it goes through (the limiter already paces us),
+    so the checkpoint never moves past a user who was only rate limited.
+    Unauthorized (401: the bot's own account/session is gone) is raised, not counted.
+    """
+    async with semaphore:
+        while True:
+            await limiter.wait()
+            try:
+                await client.copy_message(user_id, state["chat_id"], state["message_id"])
+                return "ok"
+            except FloodWait as e:
+                logger.warning(f"⏳ FloodWait {e.value}s during broadcast")
+                limiter.pause(e.value + 1)
+            except (UserIsBlocked, InputUserDeactivated):
+                return "blocked"
+            except Unauthorized:
+                raise
+            except Exception as e:
+                # Includes PeerIdInvalid: a fresh session just doesn't know the peer yet, don't prune
+                logger.error(f"Broadcast Send Error ({user_id}): {e}")
+                return "failed"
+
+async def run_broadcast(client, state, status_msg):
+    limiter = RateLimiter(BROADCAST_RATE)
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    await db.flush_users()
+
+    try:
+        async for batch in db.iter_user_batches(state.get("last_id"), BROADCAST_BATCH_SIZE):
+            user_ids = [doc["user_id"] for doc in batch]
+            results = await asyncio.gather(
+                *(send_one(client, state, uid, limiter, semaphore) for uid in user_ids),
+                return_exceptions=True
+            )
+            # A 401 is about the bot, not the users: stop before pruning or moving the checkpoint
+            fatal = next((r for r in results if isinstance(r, BaseException)), None)
+            if fatal:
+                raise fatal
+
+            # Prune blocked / deleted users in one go
+            blocked = [uid for uid, result in zip(user_ids, results) if result == "blocked"]
+            await db.delete_users(blocked)
+
+            state["sent"] += results.count("ok")
+            state["blocked"] += len(blocked)
+            state["failed"] += results.count("failed")
+            state["last_id"] = batch[-1]["_id"]
+            await db.save_broadcast(state)
+
+            try:
+                await status_msg.edit_text(
+                    f"📣 Broadcasting...\n✅ Sent: {state['sent']}\n🚫 Blocked: {state['blocked']}\n⚠️ Failed: {state['failed']}"
+                )
+            except Exception:
+                pass
+
+        await db.clear_broadcast()
+        await status_msg.edit_text(
+            f"📣 Broadcast Finished!\n✅ Sent: {state['sent']}\n🚫 Removed (blocked): {state['blocked']}\n⚠️ Failed: {state['failed']}"
+        )
+    except asyncio.CancelledError:
+        await status_msg.edit_text("🛑 Broadcast stopped.")
+        raise
+    except Unauthorized as e:
+        # Checkpoint is kept, nothing was pruned for this batch
+        logger.critical(f"❌ Broadcast aborted, bot is unauthorized: {e}")
+    except Exception as e:
+        logger.error(f"Broadcast Error: {e}")
+        await status_msg.edit_text(f"❌ Broadcast crashed: {e}\nUse /broadcast_resume to continue.")
+
+def start_broadcast(client, state, status_msg):
+    global broadcast_task
+    broadcast_task = asyncio.create_task(run_broadcast(client, state, status_msg))
+
+def is_running():
+    return broadcast_task is not None and not broadcast_task.done()
+
+@Client.on_message(filters.command("broadcast") & filters.user(OWNER_ID))
+async def broadcast_command(client, message):
+    if not message.reply_to_message:
+        return await message.reply_text("Reply to the message you want to broadcast with /broadcast")
+    if is_running() or await db.get_broadcast():
+        return await message.reply_text("⚠️ A broadcast is already pending. Use /broadcast_resume or /broadcast_cancel.")
+
+    state = {
+        "chat_id": message.chat.id,
+        "message_id": message.reply_to_message.id,
+        "last_id": None,
+        "sent": 0,
+        "blocked": 0,
+        "failed": 0
+    }
+    await db.save_broadcast(state)
+    status_msg = await message.reply_text("📣 Broadcast Started...")
+    start_broadcast(client, state, status_msg)
+
+@Client.on_message(filters.command("broadcast_resume") & filters.user(OWNER_ID))
+async def broadcast_resume_command(client, message):
+    if is_running():
+        return await message.reply_text("⚠️ Broadcast is already running.")
+    state = await db.get_broadcast()
+    if not state:
+        return await message.reply_text("Nothing to resume.")
+
+    state.pop("_id", None)
+    status_msg = await message.reply_text(f"📣 Resuming broadcast ({state['sent']} already sent)...")
+    start_broadcast(client, state, status_msg)
+
+@Client.on_message(filters.command("broadcast_cancel") & filters.user(OWNER_ID))
+async def broadcast_cancel_command(client, message):
+    if is_running():
+        broadcast_task.cancel()
+        # Let it finish its last checkpoint write before clearing
+        await asyncio.gather(broadcast_task, return_exceptions=True)
+    await db.clear_broadcast()
+    await message.reply_text("🛑 Broadcast cancelled.")
@@ -1,7 +1,10 @@
 # plugins/start.py
 from pyrogram import Client, filters
+from duck.database import db
 
 @Client.on_message(filters.command("start"))
 async def start_command(client, message):
+    if message.from_user:
+        await db.add_user(message.from_user.id, message.from_user.first_name)
     await message.reply_text("I am alive and built from scratch! 🤖")
   
@@ -0,0 +1,26 @@
+# tests/test_fallback_art.py
+import pytest
+from duck.utils.fallback_art import normalize_series_title, detect_category
+
+@pytest.mark.parametrize("headline, key", [
+    ("Frieren Season 2 Reveals New Trailer", "frieren"),
+    ("Frieren's Season 2 Reveals New Trailer", "frieren"),
+    ("Chainsaw Man's 'Reze Arc' Movie Tops Box Office", "reze-arc"),
+    ("'Don't Toy With Me, Miss Nagatoro' Gets Movie", "dont-toy-with-me-miss-nagatoro"),
+    ("Crunchyroll Announces Dandadan Season 2", "dandadan"),
+    ("Netflix Reveals Sakamoto Days", "sakamoto-days"),
+    ("Jujutsu Kaisen: Culling Game PV Released", "jujutsu-kaisen"),
+])
+def test_series_key(headline, key):
+    assert normalize_series_title(headline) == key
+
+@pytest.mark.parametrize("headline", [
+    "Crunchyroll Announces New Anime Lineup",
+    "Crunchyroll's Fall 2024 Lineup",
+])
+def test_no_series_key_for_publisher_news(headline):
+    assert normalize_series_title(headline) == ""
+
+def test_category():
+    assert detect_category("'Chainsaw Man' Movie Tops Box Office") == "movie"
+    assert detect_category("Studio Interview") == "generic"
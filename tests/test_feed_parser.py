@@ -0,0 +1,94 @@
+# tests/test_feed_parser.py
+import asyncio
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("feedparser")
+pytest.importorskip("aiohttp")
+
+from duck.utils.feed_parser import parse_bytes, parse_date, FeedEngine
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel>
+    <title>Feed</title>
+    <item>
+        <title>First News</title>
+        <link>https://example.com/1</link>
+        <description><![CDATA[<p>Summary one</p>]]></description>
+        <pubDate>Mon, 06 May 2024 10:00:00 +0900</pubDate>
+        <media:content url="https://example.com/1.jpg" medium="image" />
+        <enclosure url="https://example.com/1.png" type="image/png" length="0" />
+    </item>
+    <item>
+        <title>Second News</title>
+        <link>https://example.com/2</link>
+        <content:encoded><![CDATA[<p>Encoded body</p>]]></content:encoded>
+    </item>
+    <item>
+        <title>Third News</title>
+        <link>https://example.com/3</link>
+    </item>
+</channel>
+</rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <title>Feed</title>
+    <entry>
+        <title type="html">Hello &amp; Bye</title>
+        <link rel="enclosure" type="image/jpeg" href="https://example.com/a.jpg"/>
+        <link rel="alternate" href="https://example.com/a"/>
+        <updated>2024-05-06T10:00:00Z</updated>
+        <content type="html">Only content here</content>
+    </entry>
+</feed>"""
+
+def test_rss_item_fields():
+    entry = parse_bytes(RSS)[0]
+    assert entry.link == "https://example.com/1"
+    assert entry.title == "First News"
+    assert entry.summary == "<p>Summary one</p>"
+    assert entry.media_content == [{"url": "https://example.com/1.jpg", "medium": "image"}]
+    assert {"rel": "enclosure", "type": "image/png", "href": "https://example.com/1.png"} in entry.links
+    assert "media_content" in entry
+    assert tuple(entry.published_parsed[:5]) == (2024, 5, 6, 1, 0)
+
+def test_rss_content_encoded_is_summary_fallback():
+    assert parse_bytes(RSS)[1].summary == "<p>Encoded body</p>"
+
+def test_atom_alternate_link_and_content_fallback():
+    entry = parse_bytes(ATOM)[0]
+    assert entry.link == "https://example.com/a"
+    assert entry.title == "Hello & Bye"
+    assert entry.summary == "Only content here"
+    assert entry.links[0]["rel"] == "enclosure"
+
+def test_limit():
+    assert [e.link for e in parse_bytes(RSS, limit=2)] == ["https://example.com/1", "https://example.com/2"]
+
+def test_seen_cut_off():
+    entries = parse_bytes(RSS, seen={"https://example.com/2"})
+    assert [e.link for e in entries] == ["https://example.com/1"]
+
+def test_parse_date_formats():
+    assert tuple(parse_date("Mon, 06 May 2024 10:00:00 GMT")[:4]) == (2024, 5, 6, 10)
+    assert tuple(parse_date("2024-05-06T10:00:00+09:00")[:4]) == (2024, 5, 6, 1)
+    assert tuple(parse_date("2024-05-06T10:00:00Z")[:4]) == (2024, 5, 6, 10)
+    assert parse_date("not a date") is None
+
+def test_malformed_feed_falls_back_to_feedparser(tmp_path, monkeypatch):
+    # Unescaped '&' breaks lxml, feedparser recovers
+    path = tmp_path / "broken.xml"
+    path.write_bytes(RSS.replace(b"First News", b"Tom & Jerry"))
+
+    with pytest.raises(Exception):
+        parse_bytes(path.read_bytes())
+
+    async def parse_stream(url, limit, seen):
+        return parse_bytes(path.read_bytes(), limit, seen)
+
+    engine = FeedEngine(engine="stream")
+    monkeypatch.setattr(engine, "parse_stream", parse_stream)
+    entries = asyncio.run(engine.parse(str(path), limit=2))
+    assert [e.title for e in entries] == ["Tom & Jerry", "Second News"]
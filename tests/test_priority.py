@@ -0,0 +1,32 @@
+# tests/test_priority.py
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from duck.utils.priority import importance_score, score_entry, NewsQueue
+from config import PRIORITY_AI_FALLBACK_BELOW
+
+class Entry:
+    def __init__(self, link):
+        self.link = link
+
+def test_keyword_stems_match_headline_forms():
+    assert importance_score("Studio announces new anime", "X") == 15
+    assert importance_score("Frieren Season 2 delays premiere", "X") == 22
+
+def test_minor_fresh_story_stays_below_ai_cutoff():
+    # Recency lifts queue order, not importance
+    assert importance_score("Random interview", "Crunchyroll") < PRIORITY_AI_FALLBACK_BELOW
+    assert importance_score("Crunchyroll announces dub", "Crunchyroll") >= PRIORITY_AI_FALLBACK_BELOW
+
+def test_future_pubdate_is_clamped():
+    now = datetime.now(timezone.utc)
+    assert score_entry("Random interview", "X", now + timedelta(hours=9)) == 20
+    assert score_entry("Random interview", "X", now - timedelta(hours=5)) == pytest.approx(10, abs=0.01)
+
+def test_queue_pops_best_and_returns_importance():
+    queue = NewsQueue(aging_per_min=0)
+    queue.push(Entry("a"), 5, importance=1)
+    queue.push(Entry("b"), 50, importance=30)
+    entry, importance = asyncio.run(queue.pop())
+    assert (entry.link, importance) == ("b", 30)
+    assert len(queue) == 1